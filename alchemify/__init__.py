@@ -1 +1,2 @@
-from .core import Alchemify
\ No newline at end of file
+from .core import Alchemify
+from .grammar import FullTextSearchError
\ No newline at end of file
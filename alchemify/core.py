@@ -7,9 +7,21 @@ from sqlalchemy.sql.elements import Cast, Label
 from sqlalchemy.sql.expression import BinaryExpression, UnaryExpression, literal, and_, or_
 from sqlalchemy.types import Integer, String
 
-from .grammar import select_parser, insert_parser, update_parser
+from lark.exceptions import VisitError
+
+from .grammar import select_parser, insert_parser, update_parser, FullTextSearchError
 from .grammar import SelectTransformer, TemplateTransformer, InsertTransformer, UpdateTransformer, DeleteTransformer
 
+def _transform(transformer, parsed_query_string):
+    try:
+        return transformer.transform(parsed_query_string)
+    except VisitError as e:
+        # lark wraps everything raised by a transformer, let deliberate errors through as is
+        if isinstance(e.orig_exc, FullTextSearchError):
+            raise e.orig_exc
+        raise
+
+
 class Alchemify:
 
     def __init__(self, engine, metadata=None):
@@ -38,7 +50,7 @@ class Alchemify:
     def select_statement(self, table, query_string=None, parsed_query_string=None):
         if parsed_query_string is None:
             parsed_query_string = select_parser.parse(query_string)
-        stmt = SelectTransformer(self._tabularize(table), self.metadata).transform(parsed_query_string)
+        stmt = _transform(SelectTransformer(self._tabularize(table), self.metadata), parsed_query_string)
         return stmt
     
     def insert_statement(self, table, rows, query_string=None, parsed_query_string=None):
@@ -50,14 +62,14 @@ class Alchemify:
     def update_statement(self, table, rows, query_string=None, parsed_query_string=None):
         if parsed_query_string is None:
             parsed_query_string = insert_parser.parse(query_string)
-        stmt = UpdateTransformer(self._tabularize(table), self.metadata, rows).transform(parsed_query_string)
+        stmt = _transform(UpdateTransformer(self._tabularize(table), self.metadata, rows), parsed_query_string)
         return stmt
 
     def delete_statement(self, table, query_string=None, parsed_query_string=None):
         # same dsl for update and delete
         if parsed_query_string is None:
             parsed_query_string = update_parser.parse(query_string)
-        stmt = DeleteTransformer(self._tabularize(table), self.metadata).transform(parsed_query_string)
+        stmt = _transform(DeleteTransformer(self._tabularize(table), self.metadata), parsed_query_string)
         return stmt
 
     def get_template(self, table, query_string=None, parsed_query_string=None):
@@ -1,11 +1,12 @@
 import operator
 import warnings
+from functools import reduce
 
 from lark import Lark, Transformer, v_args
 
 from sqlalchemy import select, insert, update, delete
 from sqlalchemy import Table, Integer, String
-from sqlalchemy.sql import cast
+from sqlalchemy.sql import cast, func, table, column, literal_column
 from sqlalchemy.sql.expression import BinaryExpression, UnaryExpression, literal, and_, or_
 
 _imports = """
@@ -36,7 +37,10 @@ alias: CNAME
 
 _modifiers = """
 order: "order="ordering("," ordering)*
-ordering: reference["."direction]
+ordering: _order_key["."direction]
+_order_key: reference
+          | rank
+rank.2: "rank"
 direction: "asc" -> asc
          | "desc" -> desc
 limit: "limit="NUMBER
@@ -51,6 +55,8 @@ _whereclause = """
 whereclause: expression
 expression: _left"."operator"."_right
           | _left"="operator"."_right
+          | _left"."search_operator"."search_query
+          | _left"="search_operator"."search_query
           | _list_expression
 _list_expression: and_list_expression
                 | or_list_expression
@@ -66,6 +72,14 @@ operator: "eq"     -> eq
         | "lt"     -> lt        
         | "neq"    -> ne
         | "not."operator -> not_
+search_operator: "fts"["("language")"]   -> fts
+               | "plfts"["("language")"] -> plfts
+               | "not."search_operator   -> not_
+language: CNAME
+search_query: SEARCH_STRING
+            | SEARCH_TERMS
+SEARCH_STRING: /"[^"]*[^"\\s][^"]*"/
+SEARCH_TERMS: /[^&,()"\\s][^&,()"]*/
 reference: CNAME("."CNAME)*
 _left: reference
 _right: reference    
@@ -77,8 +91,38 @@ literal_number: NUMBER
 """
 
 
+class FullTextSearchError(Exception):
+    """
+    raised when a query asks for a full-text search the database can't run
+    """
+
+
+def _sqlite_phrases(terms):
+    # fts5 has no plainto_tsquery, quoting every term turns them into an implicit AND of plain strings
+    return " ".join('"{}"'.format(term.replace('"', '""')) for term in terms.split())
+
+
+def _sqlite_key(tbl):
+    # fts5 content_rowid has to be an integer primary key, anything else is joined on rowid
+    primary_key = list(tbl.primary_key.columns)
+    if len(primary_key) == 1 and isinstance(primary_key[0].type, Integer):
+        return primary_key[0]
+    return column('rowid', _selectable=tbl)
+
+
+def _mysql_phrases(terms):
+    # boolean mode equivalent of plainto_tsquery, every term is required and taken literally
+    return " ".join('+"{}"'.format(term.replace('"', '')) for term in terms.split())
+
+
 class BaseTransformer(Transformer):
 
+    # one per full-text search in the query, summed up by order=rank
+    rankings = ()
+    # postgres configuration for searches that don't name a language
+    # to_tsvector needs an explicit configuration to be usable in an expression index
+    text_search_config = 'simple'
+
     def select(self, args):
         # args is a list of list of dicts that represent columns   
         column_list = list()
@@ -115,12 +159,19 @@ class BaseTransformer(Transformer):
         orderings = list()
         for arg in args:
             ref = arg.children[0]
-            if len(arg.children) > 1 and not arg.children[1]:
+            descending = len(arg.children) > 1 and not arg.children[1]
+            if type(ref) is str:
+                # rank is only known once the whole query has been transformed
+                ref = (ref, descending)
+            elif descending:
                 # ascending is default
                 ref = ref.desc()
             orderings.append(ref)
         return self.order.__name__, orderings
 
+    def rank(self, args):
+        return self.rank.__name__
+
     def asc(self, args):
         return True
     def desc(self, args):
@@ -164,11 +215,54 @@ class BaseTransformer(Transformer):
         if type(op) is tuple:
             op = op[0]
             inverse = True
-        exp = BinaryExpression(left, right, op)
+        if type(op) is dict:
+            exp, ranking = self._search(left, right, **op)
+            if not inverse:
+                # rows matching a negated search have nothing to rank
+                self.rankings += (ranking,)
+        else:
+            exp = BinaryExpression(left, right, op)
         if inverse:
             exp = UnaryExpression(exp, operator=operator.inv)
         return exp
 
+    def _search(self, left, terms, plain, language=None):
+        """
+        full-text search backed by whatever the dialect natively offers
+        postgres: to_tsvector(col) @@ to_tsquery(terms), create a matching expression index
+        sqlite: MATCH against an fts5 shadow table named <table>_fts keyed on the integer primary key or rowid of <table>
+        mysql: MATCH (col) AGAINST (terms), requires a FULLTEXT index on col
+        returns the clause and its ranking, ascending with the best match first and 0 for rows that don't match
+        """
+        dialect = self.metadata.bind.dialect.name
+        if dialect == 'postgresql':
+            # a constant rather than a bind parameter, otherwise prepared statements can't use the expression index
+            config = literal_column("'{}'::regconfig".format(language or self.text_search_config))
+            vector = func.to_tsvector(config, left)
+            tsquery = (func.plainto_tsquery if plain else func.to_tsquery)(config, terms)
+            # ts_rank grows with relevance, negate so ascending order is best match first like fts5
+            return vector.op('@@')(tsquery), -func.ts_rank(vector, tsquery)
+        if dialect == 'sqlite':
+            if language:
+                warnings.warn(f"{self.metadata.bind.dialect} uses the tokenizer of the fts5 table, ignoring language {language}")
+            if plain:
+                terms = _sqlite_phrases(terms)
+            shadow = table(f"{left.table.name}_fts", column('rowid'), column('rank'), column(left.name))
+            rowid = _sqlite_key(left.table)
+            match = shadow.c[left.name].op('MATCH')(terms)
+            rank = select([shadow.c.rank]).where(and_(shadow.c.rowid == rowid, match)).as_scalar()
+            # bm25 is negative for every match, rows the search didn't match go last
+            return rowid.in_(select([shadow.c.rowid]).where(match)), func.coalesce(rank, 0)
+        if dialect == 'mysql':
+            if language:
+                warnings.warn(f"{self.metadata.bind.dialect} uses the parser of the fulltext index, ignoring language {language}")
+            if plain:
+                terms = _mysql_phrases(terms)
+            match = left.match(terms)
+            # relevance grows with the match, negate so ascending order is best match first
+            return match, -match
+        raise FullTextSearchError(f"{dialect} does not support full-text search")
+
     def and_list_expression(self, args):
         return and_(*args)
     def or_list_expression(self, args):
@@ -202,6 +296,19 @@ class BaseTransformer(Transformer):
         return operator.lt
     def ne(self, args):
         return operator.ne
+    def fts(self, args):
+        return dict(plain=False, language=args[0] if args else None)
+    def plfts(self, args):
+        return dict(plain=True, language=args[0] if args else None)
+
+    def language(self, args):
+        return args[0].value
+
+    def search_query(self, args):
+        value = args[0].value
+        if args[0].type == 'SEARCH_STRING':
+            value = value[1:-1]
+        return value.strip()
 
 select_grammar = f"""
 start: [_pair("&"_pair)*]
@@ -249,10 +356,24 @@ class SelectTransformer(BaseTransformer):
         if offset is not None:
             stmt = stmt.offset(offset)
         if order is not None:
-            stmt = stmt.order_by(*order)
+            orderings = [self._ranking(*o) if type(o) is tuple else o for o in order]
+            stmt = stmt.order_by(*[o for o in orderings if o is not None])
 
         return stmt
 
+    def _ranking(self, name, descending):
+        if self.rankings:
+            ranking = reduce(operator.add, self.rankings)
+        elif self.table.c.has_key(name):
+            # without a search rank is just a column
+            ranking = self.table.c[name]
+        else:
+            warnings.warn(f"Ordering by {name} requires a full-text search or a {name} column, ignoring")
+            return None
+        if descending:
+            return ranking.desc()
+        return ranking
+
 
 insert_grammar = f"""
 start: [_pair("&"_pair)*]
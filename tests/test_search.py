@@ -0,0 +1,119 @@
+import pytest
+
+from lark.exceptions import LarkError
+
+from sqlalchemy import create_engine, Table, Column, Integer, String
+
+from alchemify import Alchemify, FullTextSearchError
+
+
+def _mock_alchemify(url):
+    engine = create_engine(url, strategy='mock', executor=lambda *args, **kwargs: None)
+    alchemify = Alchemify(engine)
+    users = Table('users', alchemify.metadata,
+        Column('id', Integer, primary_key=True),
+        Column('name', String),
+        Column('fullname', String))
+    return alchemify, users
+
+def _compile(alchemify, table, query_string):
+    stmt = alchemify.select_statement(table, query_string)
+    return str(stmt.compile(dialect=alchemify.engine.dialect))
+
+def _names(rows):
+    return [row['name'] for row in rows]
+
+
+@pytest.fixture
+def fawlty():
+    engine = create_engine('sqlite://')
+    with engine.connect() as connection:
+        connection.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name VARCHAR, fullname VARCHAR)")
+        connection.execute("CREATE VIRTUAL TABLE users_fts USING fts5(fullname, content='users', content_rowid='id')")
+        for row in [(1, 'Basil', 'Basil Fawlty the hotel owner'),
+                    (2, 'Sybil', 'Sybil Fawlty owner owner'),
+                    (3, 'Manuel', 'Manuel from Barcelona')]:
+            connection.execute("INSERT INTO users VALUES (?, ?, ?)", row)
+        connection.execute("INSERT INTO users_fts(users_fts) VALUES('rebuild')")
+    return Alchemify(engine)
+
+
+def test_sqlite_plfts(fawlty):
+    assert _names(fawlty.select('users', 'select=name&fullname=plfts.fawlty owner&order=id')) == ['Basil', 'Sybil']
+
+def test_sqlite_fts(fawlty):
+    assert _names(fawlty.select('users', 'select=name&fullname=fts.hotel OR barcelona&order=id')) == ['Basil', 'Manuel']
+
+def test_sqlite_quoted_phrase(fawlty):
+    assert _names(fawlty.select('users', 'select=name&fullname=fts."hotel owner"')) == ['Basil']
+
+def test_sqlite_not(fawlty):
+    assert _names(fawlty.select('users', 'select=name&fullname=not.plfts.fawlty')) == ['Manuel']
+
+def test_sqlite_search_in_list_expression(fawlty):
+    rows = fawlty.select('users', 'select=name&or=(fullname.plfts.barcelona,name.eq."Basil")&order=id')
+    assert _names(rows) == ['Basil', 'Manuel']
+
+def test_sqlite_order_by_rank(fawlty):
+    assert _names(fawlty.select('users', 'select=name&fullname=plfts.owner&order=rank')) == ['Sybil', 'Basil']
+    assert _names(fawlty.select('users', 'select=name&fullname=plfts.owner&order=rank.desc')) == ['Basil', 'Sybil']
+
+def test_sqlite_order_by_rank_puts_unmatched_rows_last(fawlty):
+    rows = fawlty.select('users', 'select=name&or=(name.eq."Manuel",fullname.plfts.owner)&order=rank')
+    assert _names(rows) == ['Sybil', 'Basil', 'Manuel']
+
+def test_sqlite_order_by_rank_sums_searches(fawlty):
+    rows = fawlty.select('users', 'select=name&or=(fullname.plfts.barcelona,fullname.plfts.owner)&order=rank')
+    assert set(_names(rows)) == {'Basil', 'Sybil', 'Manuel'}
+    stmt = _compile(fawlty, 'users', 'or=(fullname.plfts.barcelona,fullname.plfts.owner)&order=rank')
+    assert stmt.count('coalesce(') == 2
+
+@pytest.mark.parametrize('query_string', ['fullname=plfts.  ', 'fullname=plfts.""', 'fullname=fts." "'])
+def test_empty_search_does_not_parse(fawlty, query_string):
+    with pytest.raises(LarkError):
+        fawlty.select('users', query_string)
+
+def test_order_by_rank_without_search(fawlty):
+    with pytest.warns(UserWarning):
+        assert _names(fawlty.select('users', 'select=name&order=rank,id')) == ['Basil', 'Sybil', 'Manuel']
+
+def test_order_by_rank_ignores_negated_search(fawlty):
+    with pytest.warns(UserWarning):
+        stmt = _compile(fawlty, 'users', 'fullname=not.plfts.basil&order=rank')
+    assert 'ORDER BY' not in stmt
+
+def test_order_by_rank_column_without_search():
+    engine = create_engine('sqlite://')
+    engine.execute("CREATE TABLE players (id INTEGER PRIMARY KEY, name VARCHAR, rank INTEGER)")
+    engine.execute("INSERT INTO players VALUES (1, 'Basil', 2), (2, 'Sybil', 1)")
+    alchemify = Alchemify(engine)
+    assert _names(alchemify.select('players', 'order=rank')) == ['Sybil', 'Basil']
+    assert _names(alchemify.select('players', 'order=rank.desc')) == ['Basil', 'Sybil']
+
+def test_sqlite_joins_on_rowid_without_integer_primary_key():
+    engine = create_engine('sqlite://')
+    engine.execute("CREATE TABLE notes (slug VARCHAR PRIMARY KEY, body VARCHAR)")
+    stmt = _compile(Alchemify(engine), 'notes', 'body=plfts.fawlty')
+    assert 'WHERE notes.rowid IN (SELECT notes_fts.rowid' in stmt
+
+
+def test_postgresql():
+    alchemify, users = _mock_alchemify('postgresql://')
+    stmt = _compile(alchemify, users, 'fullname=plfts.fawlty owner&order=rank')
+    assert "to_tsvector('simple'::regconfig, users.fullname) @@ plainto_tsquery('simple'::regconfig, %(plainto_tsquery_1)s)" in stmt
+    assert "ORDER BY -ts_rank(" in stmt
+    stmt = _compile(alchemify, users, 'fullname=fts(english).fawlty')
+    assert "to_tsvector('english'::regconfig, users.fullname) @@ to_tsquery('english'::regconfig, %(to_tsquery_1)s)" in stmt
+    stmt = _compile(alchemify, users, 'fullname=not.fts.fawlty')
+    assert "WHERE NOT (to_tsvector(" in stmt
+
+def test_mysql():
+    alchemify, users = _mock_alchemify('mysql://')
+    stmt = _compile(alchemify, users, 'fullname=plfts.fawlty owner&order=rank')
+    assert "WHERE MATCH (users.fullname) AGAINST (%s IN BOOLEAN MODE)" in stmt
+    assert "ORDER BY -(MATCH (users.fullname) AGAINST (%s IN BOOLEAN MODE))" in stmt
+
+def test_unsupported_dialect():
+    alchemify, users = _mock_alchemify('mssql://')
+    with pytest.raises(FullTextSearchError):
+        alchemify.select_statement(users, 'fullname=fts.fawlty')